@@ -1,6 +1,11 @@
 #!/usr/bin/env python3
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from selenium.common.exceptions import InvalidSessionIdException, NoSuchWindowException, TimeoutException
 from seleniumwire import webdriver
-import time
+from urllib3.exceptions import HTTPError as Urllib3Error
+import argparse
+import atexit
+import threading
 
 # Range dei canali
 CHANNELS = range(1, 100)
@@ -8,44 +13,128 @@ PLAYER_PATHS = ["watch", "player"]
 
 OUTPUT_FILE = "cazzimiei.m3u"
 
-def extract_m3u8(url):
-    options = webdriver.ChromeOptions()
-    options.add_argument("--headless=new")
-    driver = webdriver.Chrome(options=options)
-    try:
-        driver.get(url)
-        time.sleep(5)
-        m3u8_urls = set()
-        for req in driver.requests:
-            if req.response and ".m3u8" in req.url:
-                m3u8_urls.add(req.url)
-        return list(m3u8_urls)
-    except Exception as e:
-        print(f"⚠️ Errore su {url}: {e}")
-        return []
-    finally:
-        driver.quit()
-
-def scrape_channel(channel_id):
-    all_links = []
-    for path in PLAYER_PATHS:
-        url = f"https://daddylivestream.com/{path}/stream-{channel_id}.php"
-        print(f"🚀 Scraping {url}")
-        links = extract_m3u8(url)
-        if links:
-            print(f"✅ Canale {channel_id} ({path}): trovati {len(links)} link")
-            all_links.extend(links)
-        else:
-            print(f"❌ Canale {channel_id} ({path}): nessun link")
-    return all_links
+# Thread di scraping di default (--workers), ognuno con il proprio Chrome
+WORKERS = 4
+
+# Secondi massimi di attesa per il primo .m3u8
+M3U8_TIMEOUT = 8
+
+# Errori con cui la sessione è persa (Chrome chiuso, chromedriver che non
+# risponde): solo su questi il browser va ricreato
+DEAD_SESSION_ERRORS = (InvalidSessionIdException, NoSuchWindowException, ConnectionError, Urllib3Error)
+
+# Host che non servono per trovare l'm3u8: niente MITM su di loro
+SELENIUMWIRE_OPTIONS = {
+    "exclude_hosts": [
+        "google-analytics.com",
+        "googletagmanager.com",
+        "doubleclick.net",
+        "fonts.googleapis.com",
+        "fonts.gstatic.com",
+    ],
+    "mitm_http2": False,
+}
+
+class Scraper:
+    """Un Chrome headless per thread, riusato per tutte le pagine."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._drivers = []
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        # I driver nascono nei thread che li usano, qui solo la pulizia finale
+        atexit.register(self.close)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _driver(self):
+        driver = getattr(self._local, "driver", None)
+        if driver is None:
+            options = webdriver.ChromeOptions()
+            options.add_argument("--headless=new")
+            driver = webdriver.Chrome(options=options, seleniumwire_options=SELENIUMWIRE_OPTIONS)
+            self._local.driver = driver
+            with self._lock:
+                self._drivers.append(driver)
+        return driver
+
+    def _discard(self, driver):
+        # Chrome morto o bloccato: buttalo, il prossimo url ne crea uno nuovo
+        self._local.driver = None
+        with self._lock:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self):
+        with self._lock:
+            drivers, self._drivers = self._drivers, []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def extract_m3u8(self, url):
+        driver = self._driver()
+        try:
+            del driver.requests
+            driver.get(url)
+            try:
+                driver.wait_for_request(r"\.m3u8", timeout=M3U8_TIMEOUT)
+            except TimeoutException:
+                return []
+            m3u8_urls = set()
+            m3u8_add = m3u8_urls.add
+            # Il controllo sull'url costa poco, req.response no: prima l'url
+            for req in driver.iter_requests():
+                if ".m3u8" in req.url and req.response:
+                    m3u8_add(req.url)
+            return list(m3u8_urls)
+        except DEAD_SESSION_ERRORS as e:
+            print(f"⚠️ Errore su {url}, riavvio il browser: {e}")
+            self._discard(driver)
+            return []
+        except Exception as e:
+            print(f"⚠️ Errore su {url}: {e}")
+            return []
+
+def scrape_player(scraper, channel_id, path):
+    url = f"https://daddylivestream.com/{path}/stream-{channel_id}.php"
+    print(f"🚀 Scraping {url}")
+    links = scraper.extract_m3u8(url)
+    if links:
+        print(f"✅ Canale {channel_id} ({path}): trovati {len(links)} link")
+    else:
+        print(f"❌ Canale {channel_id} ({path}): nessun link")
+    return links
 
 if __name__ == "__main__":
-    all_results = []
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=WORKERS, help="numero di browser in parallelo")
+    args = parser.parse_args()
+
+    # Una coda unica di (canale, path): i thread non aspettano la fine di ogni canale
+    tasks = [(ch, path) for ch in CHANNELS for path in PLAYER_PATHS]
+    found = {}
+
+    with Scraper() as scraper, ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = {executor.submit(scrape_player, scraper, ch, path): (ch, path) for ch, path in tasks}
+        for future in as_completed(futures):
+            found[futures[future]] = future.result()
 
-    for ch in CHANNELS:
-        links = scrape_channel(ch)
-        for link in links:
-            all_results.append(f"#EXTINF:-1,Channel {ch}\n{link}")
+    all_results = [
+        f"#EXTINF:-1,Channel {ch}\n{link}"
+        for ch, path in tasks
+        for link in found[(ch, path)]
+    ]
 
     # Scrivi sempre il file, anche se vuoto
     with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
-import requests
+import argparse
+from playlist_utils import build_playlist
 
 OUTPUT_FILE = "direct_playlist.m3u8"
 
@@ -20,31 +21,17 @@ HEADERS = {
     "Referer": REFERER
 }
 
-def validate_url(url):
-    try:
-        r = requests.head(url, headers=HEADERS, timeout=5, allow_redirects=True)
-        return r.status_code == 200
-    except Exception:
-        return False
-
-def generate_playlist():
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        f.write("#EXTM3U\n")
-
-        for template in URL_TEMPLATES:
-            for i in range(1, 1000):
-                url = template.format(num=i)
-                if validate_url(url):
-                    name = url.split("/")[2].split(".")[0].upper() + " Channel " + str(i)
-                    f.write(f"#EXTINF:-1,{name}\n")
-                    f.write(f"#EXTVLCOPT:http-user-agent={USER_AGENT}\n")
-                    f.write(f"#EXTVLCOPT:http-referrer={REFERER}\n")
-                    f.write(f"{url}\n")
-                    print(f"✅ Aggiunto: {name}")
-                else:
-                    print(f"⛔ Non valido: {url}")
-
-    print(f"\n✅ Playlist salvata in: {OUTPUT_FILE}")
+# Righe VLC uguali per ogni canale
+VLC_HEADERS = "\n".join([
+    f"#EXTVLCOPT:http-user-agent={USER_AGENT}",
+    f"#EXTVLCOPT:http-referrer={REFERER}",
+]) + "\n"
+
+def generate_playlist(verbose=False):
+    build_playlist(OUTPUT_FILE, URL_TEMPLATES, headers=HEADERS, vlc_headers=VLC_HEADERS, verbose=verbose)
 
 if __name__ == "__main__":
-    generate_playlist()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--verbose", action="store_true", help="stampa anche gli url non validi")
+    args = parser.parse_args()
+    generate_playlist(verbose=args.verbose)
@@ -0,0 +1,198 @@
+import asyncio
+import hashlib
+import json
+import os
+import requests
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+CHANNEL_RANGE = range(1, 1000)
+
+# Richieste contemporanee (asyncio) e thread del fallback con requests
+CONCURRENCY = 100
+THREAD_WORKERS = 64
+
+# Dopo tanti errori di rete, 5xx o 429 di fila un host è considerato giù e si passa
+# al prossimo; qualsiasi altra risposta HTTP (anche 404) azzera il conteggio
+MAX_CONSECUTIVE_FAILURES = 20
+
+# Per riconoscere una playlist bastano i primi byte
+M3U_MAGIC = b"#EXTM3U"
+PROBE_RANGE = {"Range": "bytes=0-15"}
+
+# Esiti dei probe tra un run e l'altro: url -> [etag, timestamp, valido].
+# Un file per ogni set di header (Referer/UA cambiano l'esito e ogni script
+# salva il suo senza toccare quello degli altri)
+CACHE_FILE = "probe_cache_{key}.json"
+CACHE_TTL = 3600
+
+# Connessioni keep-alive verso gli host, usate se aiohttp non c'è
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=200,
+    max_retries=Retry(total=1, backoff_factor=0.1),
+))
+
+def cache_path(headers):
+    key = hashlib.sha1(json.dumps(headers, sort_keys=True).encode()).hexdigest()[:12]
+    return CACHE_FILE.format(key=key)
+
+def cache_entry_ok(entry, now):
+    # Voci scritte a mano o da versioni vecchie valgono come mancanti
+    return (
+        isinstance(entry, list) and len(entry) == 3
+        and isinstance(entry[0], str)
+        and isinstance(entry[1], (int, float)) and now - entry[1] < CACHE_TTL
+        and isinstance(entry[2], bool)
+    )
+
+def load_cache(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict):
+        return {}
+    now = time.time()
+    return {url: entry for url, entry in cache.items() if cache_entry_ok(entry, now)}
+
+def save_cache(cache, path):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+    os.replace(tmp, path)
+
+# Ogni probe restituisce (valido, host_giù)
+def validate_url(url, headers, cache):
+    cached = cache.get(url)
+    try:
+        head_headers = {**headers, "If-None-Match": cached[0]} if cached else headers
+        r = SESSION.head(url, headers=head_headers, timeout=5, allow_redirects=True)
+        if r.status_code == 304 and cached:
+            return cached[2], False
+        host_down = r.status_code >= 500 or r.status_code == 429
+        etag = r.headers.get("ETag")
+        # La HEAD scarta solo i non-200: il contenuto lo verifica la GET
+        valid = r.status_code == 200
+        if valid:
+            with SESSION.get(url, headers={**headers, **PROBE_RANGE}, stream=True, timeout=5) as r:
+                valid = r.status_code in (200, 206) and next(r.iter_content(16), b"").startswith(M3U_MAGIC)
+    except Exception:
+        return False, True
+    if etag:
+        cache[url] = [etag, time.time(), valid]
+    return valid, host_down
+
+def host_gave_up(template, errors):
+    print(f"🛑 {errors} errori di fila, salto il resto di: {template}")
+
+async def validate_many(templates, *, headers, cache, on_result, concurrency=CONCURRENCY):
+    sem = asyncio.Semaphore(concurrency)
+    timeout = aiohttp.ClientTimeout(total=5)
+    connector = aiohttp.TCPConnector(limit=200, ttl_dns_cache=600)
+
+    async with aiohttp.ClientSession(connector=connector, headers=headers) as sess:
+        async def check(template, i):
+            u = template.format(num=i)
+            cached = cache.get(u)
+            head_headers = {"If-None-Match": cached[0]} if cached else None
+            async with sem:
+                try:
+                    async with sess.head(u, headers=head_headers, allow_redirects=True, timeout=timeout) as r:
+                        if r.status == 304 and cached:
+                            return i, u, cached[2], False
+                        host_down = r.status >= 500 or r.status == 429
+                        etag = r.headers.get("ETag")
+                        valid = r.status == 200
+                    if valid:
+                        async with sess.get(u, headers=PROBE_RANGE, timeout=timeout) as r:
+                            valid = r.status in (200, 206) and (await r.content.read(16)).startswith(M3U_MAGIC)
+                except Exception:
+                    return i, u, False, True
+            if etag:
+                cache[u] = [etag, time.time(), valid]
+            return i, u, valid, host_down
+
+        # Task creati alternando gli host, così il semaforo li serve tutti insieme
+        tasks = {template: [] for template in templates}
+        for i in CHANNEL_RANGE:
+            for template in templates:
+                tasks[template].append(asyncio.create_task(check(template, i)))
+
+        async def follow(template):
+            errors = 0
+            for next_done in asyncio.as_completed(tasks[template]):
+                i, url, valid, host_down = await next_done
+                on_result(template, i, url, valid)
+                errors = errors + 1 if host_down else 0
+                if errors >= MAX_CONSECUTIVE_FAILURES:
+                    host_gave_up(template, errors)
+                    for task in tasks[template]:
+                        task.cancel()
+                    break
+
+        try:
+            await asyncio.gather(*(follow(t) for t in templates))
+        finally:
+            all_tasks = [task for host_tasks in tasks.values() for task in host_tasks]
+            for task in all_tasks:
+                task.cancel()
+            await asyncio.gather(*all_tasks, return_exceptions=True)
+
+def validate_templates(templates, *, headers, on_result):
+    cache_file = cache_path(headers)
+    cache = load_cache(cache_file)
+    try:
+        if aiohttp is not None:
+            asyncio.run(validate_many(templates, headers=headers, cache=cache, on_result=on_result))
+            return
+        with ThreadPoolExecutor(max_workers=THREAD_WORKERS) as executor:
+            # Probe accodati alternando gli host; i risultati arrivano man mano
+            futures = {}
+            for i in CHANNEL_RANGE:
+                for template in templates:
+                    url = template.format(num=i)
+                    futures[executor.submit(validate_url, url, headers, cache)] = (template, i, url)
+            errors = dict.fromkeys(templates, 0)
+            for future in as_completed(futures):
+                template, i, url = futures[future]
+                if future.cancelled() or errors[template] >= MAX_CONSECUTIVE_FAILURES:
+                    continue
+                valid, host_down = future.result()
+                on_result(template, i, url, valid)
+                errors[template] = errors[template] + 1 if host_down else 0
+                if errors[template] >= MAX_CONSECUTIVE_FAILURES:
+                    host_gave_up(template, errors[template])
+                    for other, (other_template, _, _) in futures.items():
+                        if other_template == template:
+                            other.cancel()
+    finally:
+        save_cache(cache, cache_file)
+
+def build_playlist(path, templates, *, headers, vlc_headers="", verbose=False):
+    source_names = {t: t.split("/")[2].split(".")[0].upper() for t in templates}
+
+    with open(path, "w", buffering=1 << 16, encoding="utf-8") as f:
+        f.write("#EXTM3U\n")
+
+        # Ogni canale valido va su disco appena verificato
+        def write_entry(template, i, url, valid):
+            if valid:
+                name = f"{source_names[template]} Channel {i}"
+                f.write(f"#EXTINF:-1,{name}\n{vlc_headers}{url}\n")
+                print(f"✅ Aggiunto: {name}")
+            elif verbose:
+                print(f"⛔ Non valido: {url}")
+
+        validate_templates(templates, headers=headers, on_result=write_entry)
+
+    print(f"\n✅ Playlist salvata in: {path}")
@@ -1,14 +1,31 @@
-from flask import Flask, Response, request
+from flask import Flask, Response, request, stream_with_context
 import requests
 
 app = Flask(__name__)
 
+# Blocchi grandi come un buffer di ricezione: meno yield per MB di video
+CHUNK_SIZE = 64 * 1024
+
+# Header del client girati all'upstream: niente Host, cookie o hop-by-hop
+FORWARD_REQUEST_HEADERS = {"user-agent", "referer", "range", "accept"}
+# Header dell'upstream rimandati al client oltre al Content-Type
+FORWARD_RESPONSE_HEADERS = ("Content-Range", "Accept-Ranges", "Cache-Control")
+
 @app.route("/watch/<path:url>")
 def proxy(url):
     try:
         if not url.startswith("http"):
             url = "https://" + url
-        r = requests.get(url, headers=request.headers, stream=True, timeout=10)
-        return Response(r.iter_content(chunk_size=1024), content_type=r.headers.get("Content-Type"))
+        upstream_headers = {k: v for k, v in request.headers if k.lower() in FORWARD_REQUEST_HEADERS}
+        r = requests.get(url, headers=upstream_headers, stream=True, timeout=10)
+        headers = {k: r.headers[k] for k in FORWARD_RESPONSE_HEADERS if k in r.headers}
+        resp = Response(
+            stream_with_context(r.iter_content(chunk_size=CHUNK_SIZE)),
+            status=r.status_code,
+            headers=headers,
+            content_type=r.headers.get("Content-Type"),
+        )
+        resp.call_on_close(r.close)
+        return resp
     except Exception as e:
         return f"Proxy error: {e}", 500
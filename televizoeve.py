@@ -1,5 +1,16 @@
 import datetime
 import json
+import re
+import requests
+from requests.adapters import HTTPAdapter
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # File locale con il calendario
 LOCAL_FILE = "schedule-generated.php"
@@ -13,49 +24,68 @@ IMPORTANT_PREFIXES = [
     "France - Ligue 1 : "
 ]
 
+# Tutti i prefissi in un'unica regex, un solo match per evento
+IMPORTANT_RE = re.compile("|".join(re.escape(prefix) for prefix in IMPORTANT_PREFIXES))
+
 PLAYER_PATHS = ["stream", "cast", "watch", "player"]
 
-def day_suffix(day):
-    if 11 <= day <= 13:
-        return "th"
-    last_digit = day % 10
-    if last_digit == 1:
-        return "st"
-    elif last_digit == 2:
-        return "nd"
-    elif last_digit == 3:
-        return "rd"
-    else:
-        return "th"
+USER_AGENT = "Mozilla/5.0 (SMART-TV; Linux; Tizen 6.0) AppleWebKit/537.36 (KHTML, like Gecko) SamsungBrowser/2.1 TV Safari/537.36"
+REFERER = "https://jxoplay.xyz/"
+
+# Righe VLC uguali per ogni canale
+VLC_OPTS = (
+    f"#EXTVLCOPT:http-referrer={REFERER}\n"
+    f"#EXTVLCOPT:http-user-agent={USER_AGENT}\n"
+)
+
+# Canali verificati in parallelo, uno per thread, per trovare il player giusto
+PROBE_WORKERS = 16
+
+# Stessi header del player, un pool grande quanto i thread
+SESSION = requests.Session()
+SESSION.headers.update({"User-Agent": USER_AGENT, "Referer": REFERER})
+SESSION.mount("https://", HTTPAdapter(pool_maxsize=PROBE_WORKERS))
+
+# Solo "H:M" con 1-2 cifre per parte, come accetta strptime("%H:%M")
+TIME_RE = re.compile(r"(\d{1,2}):(\d{1,2})")
+
+# Suffisso inglese per giorno % 10 (11, 12 e 13 fanno eccezione)
+DAY_SUFFIXES = ["th", "st", "nd", "rd"] + ["th"] * 6
+
+@lru_cache(maxsize=1)
+def schedule_date_string(ordinal):
+    date = datetime.date.fromordinal(ordinal)
+    day = date.day
+    suffix = "th" if 11 <= day <= 13 else DAY_SUFFIXES[day % 10]
+    return date.strftime(f"%A {day}{suffix} %B %Y - Schedule Time UK GMT")
 
 def get_today_date_string():
-    now = datetime.datetime.utcnow()
-    day = now.day
-    suffix = day_suffix(day)
-    day_str = f"{day}{suffix}"
-    date_str = now.strftime(f"%A {day_str} %B %Y - Schedule Time UK GMT")
-    return date_str
+    return schedule_date_string(datetime.datetime.now(datetime.timezone.utc).toordinal())
 
 def add_two_hours(time_str):
-    try:
-        dt = datetime.datetime.strptime(time_str, "%H:%M")
-        dt_plus2 = dt + datetime.timedelta(hours=2)
-        return dt_plus2.strftime("%H:%M")
-    except Exception:
+    match = TIME_RE.fullmatch(time_str) if isinstance(time_str, str) else None
+    if match is None:
         return time_str
+    h, m = int(match.group(1)), int(match.group(2))
+    if not (0 <= h < 24 and 0 <= m < 60):
+        return time_str
+    return f"{(h + 2) % 24:02d}:{m:02d}"
 
 def is_important(event_name):
-    for prefix in IMPORTANT_PREFIXES:
-        if event_name.startswith(prefix):
-            # Esclude Bundesliga 2
-            if prefix.startswith("Bundesliga") and "2" in event_name:
-                return False
-            return True
-    return False
+    m = IMPORTANT_RE.match(event_name)
+    if m is None:
+        return False
+    # Esclude Bundesliga 2
+    return not (m.group(0).startswith("Bundesliga") and "2" in event_name)
+
+@lru_cache(maxsize=1)
+def load_schedule():
+    with open(LOCAL_FILE, "rb") as f:
+        raw = f.read()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
 
 def get_soccer_events_for_date(target_date):
-    with open(LOCAL_FILE, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = load_schedule()
 
     if target_date not in data:
         print(f"⚠️ Attenzione: data {target_date} non trovata nel file locale.")
@@ -64,18 +94,44 @@ def get_soccer_events_for_date(target_date):
     soccer_events = data[target_date].get("All Soccer Events", [])
     return [e for e in soccer_events if is_important(e.get("event", ""))]
 
+def event_channels(event):
+    channels = []
+    for channel in event.get("channels", []) + event.get("channels2", []):
+        if isinstance(channel, dict):
+            channels.append(channel)
+        else:
+            print(f"⚠️ Formato imprevisto per channel: {channel}")
+    return channels
+
+def player_url(path, channel_id):
+    return f"https://daddylivestream.com/{path}/stream-{channel_id}.php"
+
+def probe_url(url):
+    try:
+        return SESSION.head(url, timeout=5, allow_redirects=True).status_code == 200
+    except Exception:
+        return False
+
+def first_live_url(channel_id):
+    # I path si provano in ordine: ci si ferma al primo che risponde 200
+    for path in PLAYER_PATHS:
+        url = player_url(path, channel_id)
+        if probe_url(url):
+            return url
+    return None
+
+def find_live_urls(channel_ids):
+    channel_ids = list(channel_ids)
+    with ThreadPoolExecutor(max_workers=PROBE_WORKERS) as executor:
+        return dict(zip(channel_ids, executor.map(first_live_url, channel_ids)))
+
 def save_m3u_with_groups(all_links, filename="gruppata.m3u"):
+    grouped = defaultdict(list)
+    for group_title, channel_name, url in all_links:
+        grouped[group_title].append(f'#EXTINF:-1 group-title="{group_title}",{channel_name}\n{VLC_OPTS}{url}\n')
+
     with open(filename, "w", encoding="utf-8") as f:
-        f.write("#EXTM3U\n")
-        grouped = {}
-        for group_title, channel_name, url in all_links:
-            grouped.setdefault(group_title, []).append((channel_name, url))
-        for group_title, channels in grouped.items():
-            for channel_name, url in channels:
-                f.write(f'#EXTINF:-1 group-title="{group_title}",{channel_name}\n')
-                f.write("#EXTVLCOPT:http-referrer=https://jxoplay.xyz/\n")
-                f.write("#EXTVLCOPT:http-user-agent=Mozilla/5.0 (SMART-TV; Linux; Tizen 6.0) AppleWebKit/537.36 (KHTML, like Gecko) SamsungBrowser/2.1 TV Safari/537.36\n")
-                f.write(url + "\n")
+        f.write("#EXTM3U\n" + "".join(entry for entries in grouped.values() for entry in entries))
 
 def main():
     today_str = get_today_date_string()
@@ -86,27 +142,38 @@ def main():
 
     print(f"Trovati {len(events)} eventi Soccer importanti da processare\n")
 
-    for event in events:
+    # I channel non-dict vengono scartati una volta sola, qui
+    events = [(event, event_channels(event)) for event in events]
+    live_urls = find_live_urls({
+        channel.get("channel_id") for _, channels in events for channel in channels
+    })
+    if live_urls and not any(live_urls.values()):
+        # Probabilmente è la rete (o un blocco) e non il sito: ogni canale
+        # ricade su tutti i path, come senza probe
+        print("⚠️ Nessun player ha risposto ai probe, tengo tutti i path per ogni canale\n")
+
+    for event, channels in events:
         event_name = event.get("event", "Unknown Event")
         time_ev = event.get("time", "")
-        time_plus2 = add_two_hours(time_ev)
-
-        all_channels = event.get("channels", []) + event.get("channels2", [])
-
-        for channel in all_channels:
-            if isinstance(channel, dict):
-                channel_name = channel.get("channel_name", "Unknown Channel")
-                channel_id = channel.get("channel_id")
-
-                for path in PLAYER_PATHS:
-                    php_url = f"https://daddylivestream.com/{path}/stream-{channel_id}.php"
-                    print(f"🕒 {time_ev} | 🏟 {event_name}")
-                    print(f"   📺 Canale: {channel_name} (ID: {channel_id})")
-                    print(f"   🔗 Link diretto: {php_url}")
-
-                    all_links.append((f"[{time_plus2}] {event_name}", channel_name, php_url))
+        group_title = f"[{add_two_hours(time_ev)}] {event_name}"
+
+        for channel in channels:
+            channel_name = channel.get("channel_name", "Unknown Channel")
+            channel_id = channel.get("channel_id")
+            live_url = live_urls[channel_id]
+
+            print(f"🕒 {time_ev} | 🏟 {event_name}")
+            print(f"   📺 Canale: {channel_name} (ID: {channel_id})")
+            if live_url is None:
+                # Nessuna risposta: si tengono tutti i path, come prima
+                print("   ⚠️ Nessun player ha risposto, tengo tutti i path")
+                php_urls = [player_url(path, channel_id) for path in PLAYER_PATHS]
             else:
-                print(f"⚠️ Formato imprevisto per channel: {channel}")
+                php_urls = [live_url]
+
+            for php_url in php_urls:
+                print(f"   🔗 Link diretto: {php_url}")
+                all_links.append((group_title, channel_name, php_url))
 
     save_m3u_with_groups(all_links, filename="televizoeve.m3u")
     print(f"\n✅ Playlist creata: gruppata.m3u")